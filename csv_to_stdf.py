@@ -6,16 +6,28 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
 import sys
 import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Sequence
+from typing import Dict, List, Optional, Sequence
 
 from stdf_converter.csv_parser import ParsedCsv, TestDefinition, parse_csv
 from stdf_converter import writer as stdf_writer
 
+# Coalesce the many small per-record writes into ~1 MiB chunks.
+OUTPUT_BUFFER_SIZE = 1 << 20
+# Most recent ALARM_ID values tracked for PTR block reuse; bounds the cache when
+# error codes vary from device to device.
+PTR_BLOCK_CACHE_SIZE = 16
+# ProcessPoolExecutor refuses more than 61 workers on Windows.
+WINDOWS_MAX_WORKERS = 61
+
 
 @dataclass
 class MetaConfig:
@@ -49,7 +61,14 @@ def main() -> None:
     parser.add_argument("--meta", help="Optional JSON file with MIR overrides and ATR notes")
     parser.add_argument("--head", type=int, default=1, help="Default test head number")
     parser.add_argument("--site", type=int, default=1, help="Default site number")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of worker processes for batch conversion (defaults to one per CPU core)",
+    )
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("--jobs must be at least 1")
 
     jobs = build_jobs(args)
     if not jobs:
@@ -57,13 +76,32 @@ def main() -> None:
 
     meta_cfg = load_meta_config(args.meta, default_head=args.head, default_site=args.site)
     failures: List[tuple[ConversionJob, Exception]] = []
-    for job in jobs:
-        try:
-            convert_csv_file(job.input_path, job.output_path, meta_cfg, source_label="CLI")
-            print(f"[OK] {job.input_path} → {job.output_path}")
-        except Exception as exc:  # noqa: BLE001
-            failures.append((job, exc))
-            print(f"[FAIL] {job.input_path}: {exc}", file=sys.stderr)
+    max_workers = pool_size(len(jobs), args.jobs)
+    if max_workers == 1:
+        for job in jobs:
+            try:
+                run_job(job, meta_cfg)
+                print(f"[OK] {job.input_path} → {job.output_path}")
+            except Exception as exc:  # noqa: BLE001
+                failures.append((job, exc))
+                print(f"[FAIL] {job.input_path}: {exc}", file=sys.stderr)
+    else:
+        # Jobs are fully independent (separate input/output paths), and parsing plus
+        # record encoding are pure Python, so processes rather than threads.
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=init_worker,
+            initargs=(meta_cfg,),
+        ) as executor:
+            futures = {executor.submit(run_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    future.result()
+                    print(f"[OK] {job.input_path} → {job.output_path}")
+                except Exception as exc:  # noqa: BLE001
+                    failures.append((job, exc))
+                    print(f"[FAIL] {job.input_path}: {exc}", file=sys.stderr)
 
     if failures:
         print(f"Completed with {len(failures)} error(s).", file=sys.stderr)
@@ -72,6 +110,43 @@ def main() -> None:
         raise SystemExit(1)
 
 
+def pool_size(job_count: int, requested: int | None = None) -> int:
+    """Return how many worker processes to use for ``job_count`` conversions."""
+
+    workers = min(job_count, requested or os.cpu_count() or 1)
+    if sys.platform == "win32":
+        workers = min(workers, WINDOWS_MAX_WORKERS)
+    return max(1, workers)
+
+
+# Set once per worker process so the shared metadata config is pickled per worker
+# rather than per submitted job.
+_WORKER_META_CFG: MetaConfig | None = None
+_WORKER_SOURCE_LABEL = "CLI"
+
+
+def init_worker(meta_cfg: MetaConfig, source_label: str = "CLI") -> None:
+    """Process-pool initializer shared by the CLI and the GUI."""
+
+    global _WORKER_META_CFG, _WORKER_SOURCE_LABEL
+    _WORKER_META_CFG = meta_cfg
+    _WORKER_SOURCE_LABEL = source_label
+
+
+def run_job(job: ConversionJob, meta_cfg: MetaConfig | None = None, source_label: str | None = None) -> Path:
+    """Convert one job, in-process or in a worker set up by :func:`init_worker`."""
+
+    meta_cfg = meta_cfg or _WORKER_META_CFG
+    if meta_cfg is None:
+        raise RuntimeError("Worker process was not initialised with a metadata config")
+    return convert_csv_file(
+        job.input_path,
+        job.output_path,
+        meta_cfg,
+        source_label=source_label or _WORKER_SOURCE_LABEL,
+    )
+
+
 def load_meta_config(meta_path: str | None, default_head: int, default_site: int) -> MetaConfig:
     if not meta_path:
         return MetaConfig(
@@ -108,10 +183,11 @@ def build_jobs(args) -> List[ConversionJob]:
     if args.inputs:
         output_dir = Path(args.output_dir or ".").expanduser()
         output_dir.mkdir(parents=True, exist_ok=True)
-        return [
-            ConversionJob(Path(input_path), output_dir / (Path(input_path).stem + ".stdf"))
-            for input_path in args.inputs
-        ]
+        jobs: List[ConversionJob] = []
+        for raw_input in args.inputs:
+            input_path = Path(raw_input)
+            jobs.append(ConversionJob(input_path, output_dir / (input_path.stem + ".stdf")))
+        return jobs
 
     single_output = Path(args.output).expanduser()
     single_output.parent.mkdir(parents=True, exist_ok=True)
@@ -126,6 +202,7 @@ def convert_csv_file(
     source_label: str | None = None,
 ) -> Path:
     input_path = Path(input_path)
+    input_name = input_path.name
     parsed = parse_csv(str(input_path))
     if not parsed.devices:
         raise ValueError(f"No device rows detected in {input_path}")
@@ -133,107 +210,120 @@ def convert_csv_file(
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     alias_map = meta_cfg.column_aliases
-    timestamps = [_device_timestamp(device.metadata, alias_map) for device in parsed.devices]
-    setup_time = min(timestamps)
-    finish_time = max(timestamps)
-
-    with output_path.open("wb") as stream:
-        stdf = stdf_writer.BinaryRecordWriter(stream)
-        stdf.write(stdf_writer.FAR, {"CPU_TYPE": 2, "STDF_VER": 4})
-
-        invoker = source_label or Path(sys.argv[0]).name
-        atr_messages = [f"csv_to_stdf {invoker} input={Path(input_path).name}"] + meta_cfg.atr_entries
-        now = int(time.time())
-        for message in atr_messages:
-            stdf.write(stdf_writer.ATR, {"MOD_TIM": now, "CMD_LINE": message})
-
-        mir_values = build_mir_values(parsed, setup_time, meta_cfg)
-        stdf.write(stdf_writer.MIR, mir_values)
-
-        for device, device_ts in zip(parsed.devices, timestamps):
-            write_device_records(
-                stdf,
-                parsed,
-                device,
-                device_ts,
-                head=meta_cfg.head_number,
-                site=meta_cfg.site_number,
-                alias_map=alias_map,
+    setup_time = finish_time = None
+    pass_flags: List[bool] = []
+    for device in parsed.devices:
+        device.norm_metadata = _normalize_metadata(device.metadata)
+        device_ts = _device_timestamp(device.metadata, alias_map, device.norm_metadata)
+        if setup_time is None or device_ts < setup_time:
+            setup_time = device_ts
+        if finish_time is None or device_ts > finish_time:
+            finish_time = device_ts
+        pass_flags.append(_is_pass(device.metadata, alias_map, device.norm_metadata))
+
+    with output_path.open("wb", buffering=OUTPUT_BUFFER_SIZE) as output:
+        preallocated = _preallocate(output, _estimate_output_size(parsed))
+        try:
+            stdf = stdf_writer.BatchRecordWriter(output)
+            stdf.write(stdf_writer.FAR, {"CPU_TYPE": 2, "STDF_VER": 4})
+
+            invoker = source_label or Path(sys.argv[0]).name
+            now = int(time.time())
+            invocation = f"csv_to_stdf {invoker} input={input_name}"
+            stdf.write(stdf_writer.ATR, {"MOD_TIM": now, "CMD_LINE": invocation})
+            for message in meta_cfg.atr_entries:
+                stdf.write(stdf_writer.ATR, {"MOD_TIM": now, "CMD_LINE": message})
+
+            mir_values = build_mir_values(parsed, setup_time, meta_cfg)
+            stdf.write(stdf_writer.MIR, mir_values)
+
+            ptr_templates = build_ptr_templates(parsed, meta_cfg.head_number, meta_cfg.site_number)
+            ptr_blocks: OrderedDict[bytes, Optional[stdf_writer.TemplateBlock]] = OrderedDict()
+
+            for device, is_pass in zip(parsed.devices, pass_flags):
+                write_device_records(
+                    stdf,
+                    device,
+                    is_pass=is_pass,
+                    ptr_templates=ptr_templates,
+                    ptr_blocks=ptr_blocks,
+                    head=meta_cfg.head_number,
+                    site=meta_cfg.site_number,
+                    alias_map=alias_map,
+                )
+
+            stdf.write(
+                stdf_writer.MRR,
+                {
+                    "FINISH_T": finish_time,
+                    "DISP_COD": "P" if all(pass_flags) else "F",
+                    "USR_DESC": "CSV to STDF conversion complete",
+                    "EXC_DESC": "",
+                },
             )
-
-        stdf.write(
-            stdf_writer.MRR,
-            {
-                "FINISH_T": finish_time,
-                "DISP_COD": "P" if _all_passed(parsed.devices, alias_map) else "F",
-                "USR_DESC": "CSV to STDF conversion complete",
-                "EXC_DESC": "",
-            },
-        )
+            stdf.flush_batch()
+        finally:
+            if preallocated:
+                # Drop whatever part of the reservation was not written, including
+                # when encoding fails part way through.
+                output.truncate()
 
     return output_path
 
 
 def build_mir_values(parsed: ParsedCsv, setup_time: int, meta_cfg: MetaConfig) -> Dict[str, object]:
-    first_meta = parsed.devices[0].metadata
+    first_device = parsed.devices[0]
+    first_meta = first_device.metadata
+    first_norm = first_device.norm_metadata
     alias_map = meta_cfg.column_aliases
 
     def lookup(*keys: str, default: str = "") -> str:
-        return _meta_lookup(first_meta, alias_map, *keys, default=default)
+        return _meta_lookup(first_meta, alias_map, *keys, default=default, norm_metadata=first_norm)
+
+    test_mode = lookup("TEST_MODE")
+    product_part = lookup("PRODUCT_PART")
+    test_location = lookup("Test_Location")
+    tester = lookup("TESTER")
+    test_program = lookup("TEST_PROGRAM")
+    station = lookup("Station")
 
     mir_values: Dict[str, object] = {
         "SETUP_T": setup_time,
         "START_T": setup_time,
         "STAT_NUM": 1,
-        "MODE_COD": (lookup("TEST_MODE") or "P")[:1],
+        "MODE_COD": (test_mode or "P")[:1],
         "LOT_ID": lookup("LOT_ID", default="UNKNOWN"),
-        "PART_TYP": lookup("PRODUCT_PART"),
-        "NODE_NAM": lookup("Test_Location"),
+        "PART_TYP": product_part,
+        "NODE_NAM": test_location,
         "TSTR_TYP": lookup("TESTER_TYPE", "TESTER"),
         "JOB_NAM": lookup("TEST_PROGRAM", "Test_Name"),
         "JOB_REV": lookup("REVISION"),
         "OPER_NAM": lookup("SFIS_State"),
         "EXEC_TYP": lookup("Model"),
-        "EXEC_VER": lookup("TESTER"),
+        "EXEC_VER": tester,
         "TEST_COD": lookup("Test_Name"),
-        "TST_TEMP": lookup("Station"),
+        "TST_TEMP": station,
         "USER_TXT": "Generated via csv_to_stdf",
         "PKG_TYP": lookup("Package_Type"),
-        "FAMLY_ID": lookup("PRODUCT_PART"),
+        "FAMLY_ID": product_part,
         "DATE_COD": lookup("DATE"),
-        "FACIL_ID": lookup("Test_Location"),
-        "FLOOR_ID": lookup("Station"),
-        "PROC_ID": lookup("TEST_PROGRAM"),
-        "OPER_FRQ": lookup("TEST_MODE"),
+        "FACIL_ID": test_location,
+        "FLOOR_ID": station,
+        "PROC_ID": test_program,
+        "OPER_FRQ": test_mode,
         "FLOW_ID": lookup("Test_Type"),
-        "SETUP_ID": lookup("Test_Location"),
-        "SERL_NUM": lookup("TESTER"),
+        "SETUP_ID": test_location,
+        "SERL_NUM": tester,
     }
     mir_values.update(meta_cfg.mir_overrides)
     return mir_values
 
 
-def write_device_records(
-    stdf: stdf_writer.BinaryRecordWriter,
-    parsed: ParsedCsv,
-    device,
-    timestamp: int,
-    head: int,
-    site: int,
-    alias_map: Dict[str, Sequence[str]],
-) -> None:
-    metadata = device.metadata
-    lookup = lambda *keys, default="": _meta_lookup(metadata, alias_map, *keys, default=default)
-    stdf.write(stdf_writer.PIR, {"HEAD_NUM": head, "SITE_NUM": site})
+def build_ptr_templates(parsed: ParsedCsv, head: int, site: int) -> List[stdf_writer.RecordTemplate]:
+    """Return one pre-encoded PTR per test; only RESULT and ALARM_ID vary per device."""
 
-    executed_tests = 0
-    for test_def in parsed.tests:
-        raw_value = device.measurements.get(test_def.test_number)
-        numeric_value = _parse_result_number(raw_value)
-        if numeric_value is None:
-            continue
-        executed_tests += 1
-        stdf.write(
+    return [
+        stdf_writer.RecordTemplate(
             stdf_writer.PTR,
             {
                 "TEST_NUM": test_def.test_number,
@@ -241,7 +331,6 @@ def write_device_records(
                 "SITE_NUM": site,
                 "TEST_FLG": 0,
                 "PARM_FLG": 0,
-                "RESULT": numeric_value,
                 "TEST_TXT": test_def.name,
                 "UNITS": test_def.unit or "",
                 "LO_LIMIT": _limit_or_nan(test_def.lower_limit),
@@ -252,43 +341,111 @@ def write_device_records(
                 "LLM_SCAL": 0,
                 "HLM_SCAL": 0,
                 "OPT_FLAG": 0,
-                "ALARM_ID": lookup("Error Code"),
             },
+            ("RESULT", "ALARM_ID"),
         )
+        for test_def in parsed.tests
+    ]
+
 
-    is_pass = _is_pass(metadata, alias_map)
+def write_device_records(
+    stdf: stdf_writer.BinaryRecordWriter,
+    device,
+    is_pass: bool,
+    ptr_templates: Sequence[stdf_writer.RecordTemplate],
+    head: int,
+    site: int,
+    alias_map: Dict[str, Sequence[str]],
+    ptr_blocks: Optional[OrderedDict[bytes, Optional[stdf_writer.TemplateBlock]]] = None,
+) -> None:
+    metadata = device.metadata
+    norm_metadata = device.norm_metadata
+    stdf.write(stdf_writer.PIR, {"HEAD_NUM": head, "SITE_NUM": site})
+
+    alarm_id = _meta_lookup(metadata, alias_map, "Error Code", norm_metadata=norm_metadata)
+    alarm_field = stdf_writer.preencode("Cn", alarm_id)
+    block = None
+    if ptr_blocks is not None and len(device.result_values) == len(ptr_templates):
+        block = _ptr_block(ptr_blocks, ptr_templates, alarm_field)
+    if block is not None:
+        stdf.write_block(block, device.result_values)
+    else:
+        for test_idx, numeric_value in zip(device.result_indices, device.result_values):
+            stdf.write_template(ptr_templates[test_idx], numeric_value, alarm_field)
+
+    test_time = _meta_lookup(metadata, alias_map, "Test Time", default="0", norm_metadata=norm_metadata)
     prr_payload = {
         "HEAD_NUM": head,
         "SITE_NUM": site,
         "PART_FLG": 0 if is_pass else 1,
-        "NUM_TEST": executed_tests,
+        "NUM_TEST": len(device.result_values),
         "HARD_BIN": 1 if is_pass else 255,
-        "SOFT_BIN": _parse_int(lookup("Error Code")) or (1 if is_pass else 255),
-        "X_COORD": _parse_int(lookup("X_CID")) or 0,
-        "Y_COORD": _parse_int(lookup("Y_CID")) or 0,
-        "TEST_T": int(float(lookup("Test Time", default="0") or 0)),
-        "PART_ID": _resolve_part_id(metadata, alias_map),
-        "PART_TXT": lookup("PRODUCT_PART"),
+        "SOFT_BIN": _parse_int(alarm_id) or (1 if is_pass else 255),
+        "X_COORD": _parse_int(_meta_lookup(metadata, alias_map, "X_CID", norm_metadata=norm_metadata)) or 0,
+        "Y_COORD": _parse_int(_meta_lookup(metadata, alias_map, "Y_CID", norm_metadata=norm_metadata)) or 0,
+        "TEST_T": int(float(test_time or 0)),
+        "PART_ID": _resolve_part_id(metadata, alias_map, norm_metadata),
+        "PART_TXT": _meta_lookup(metadata, alias_map, "PRODUCT_PART", norm_metadata=norm_metadata),
         "PART_FIX": b"",
     }
     stdf.write(stdf_writer.PRR, prr_payload)
+    stdf.flush_batch()
 
 
-def _all_passed(devices, alias_map) -> bool:
-    return all(_is_pass(device.metadata, alias_map) for device in devices)
+def _ptr_block(
+    ptr_blocks: OrderedDict[bytes, Optional[stdf_writer.TemplateBlock]],
+    ptr_templates: Sequence[stdf_writer.RecordTemplate],
+    alarm_field: bytes,
+) -> Optional[stdf_writer.TemplateBlock]:
+    """Return the cached all-PTR block for ``alarm_field`` once that ALARM_ID repeats.
 
+    A fully populated device's PTRs differ only in RESULT, so they can be packed in
+    one call. Building a block costs more than one templated write, so the first
+    sighting of an ALARM_ID only records it; the cache is kept LRU-bounded.
+    """
 
-def _is_pass(metadata: Dict[str, str], alias_map: Dict[str, Sequence[str]] | None = None) -> bool:
-    return (_meta_lookup(metadata, alias_map, "Test Result") or "").strip().upper() == "PASS"
+    if alarm_field not in ptr_blocks:
+        ptr_blocks[alarm_field] = None
+        if len(ptr_blocks) > PTR_BLOCK_CACHE_SIZE:
+            ptr_blocks.popitem(last=False)
+        return None
+    ptr_blocks.move_to_end(alarm_field)
+    block = ptr_blocks[alarm_field]
+    if block is None:
+        block = ptr_blocks[alarm_field] = stdf_writer.TemplateBlock(ptr_templates, alarm_field)
+    return block
 
 
-def _parse_result_number(value: str | None) -> float | None:
-    if not value:
-        return None
+def _estimate_output_size(parsed: ParsedCsv) -> int:
+    # Rough size assuming every measurement is populated; record headers are 4 bytes.
+    # Per-device ALARM_ID text is not counted, and PRR strings beyond 64 bytes or
+    # MIR/ATR records beyond 4 KiB are not either, so the file can still grow past
+    # the reservation; it only saves the common case from repeated extent growth.
+    ptr_size = 4 + stdf_writer.PTR.fixed_size
+    per_device = sum(ptr_size + len(test.name) + len(test.unit or "") for test in parsed.tests)
+    per_device += 4 + stdf_writer.PIR.fixed_size + 4 + stdf_writer.PRR.fixed_size + 64
+    return 4096 + len(parsed.devices) * per_device
+
+
+def _preallocate(stream, size: int) -> bool:
+    """Reserve ``size`` bytes for ``stream`` where the platform supports it."""
+
+    if not hasattr(os, "posix_fallocate") or size <= 0:
+        return False
     try:
-        return float(value)
-    except ValueError:
-        return None
+        os.posix_fallocate(stream.fileno(), 0, size)
+    except OSError:
+        return False
+    return True
+
+
+def _is_pass(
+    metadata: Dict[str, str],
+    alias_map: Dict[str, Sequence[str]] | None = None,
+    norm_metadata: Dict[str, str] | None = None,
+) -> bool:
+    result = _meta_lookup(metadata, alias_map, "Test Result", norm_metadata=norm_metadata)
+    return (result or "").strip().upper() == "PASS"
 
 
 def _limit_or_nan(value: float | None) -> float:
@@ -301,37 +458,71 @@ def _parse_int(value: str | None) -> int | None:
     value = value.strip()
     if not value:
         return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
     try:
         return int(float(value))
     except ValueError:
         return None
 
 
-def _resolve_part_id(metadata: Dict[str, str], alias_map: Dict[str, Sequence[str]] | None = None) -> str:
+def _resolve_part_id(
+    metadata: Dict[str, str],
+    alias_map: Dict[str, Sequence[str]] | None = None,
+    norm_metadata: Dict[str, str] | None = None,
+) -> str:
     for key in ("DMC_string", "IC_serial_CID", "IC_DEVICE_ID_CID", "product_id_CID", "Test_CID"):
-        value = _meta_lookup(metadata, alias_map, key)
+        value = _meta_lookup(metadata, alias_map, key, norm_metadata=norm_metadata)
         if value:
             return value
-    return _meta_lookup(metadata, alias_map, "PRODUCT_PART")
+    return _meta_lookup(metadata, alias_map, "PRODUCT_PART", norm_metadata=norm_metadata)
 
 
-def _device_timestamp(metadata: Dict[str, str], alias_map: Dict[str, Sequence[str]] | None = None) -> int:
-    raw = _meta_lookup(metadata, alias_map, "DATE")
+def _device_timestamp(
+    metadata: Dict[str, str],
+    alias_map: Dict[str, Sequence[str]] | None = None,
+    norm_metadata: Dict[str, str] | None = None,
+) -> int:
+    raw = _meta_lookup(metadata, alias_map, "DATE", norm_metadata=norm_metadata)
     if raw:
-        for fmt in ("%Y%m%d_%H%M%S", "%Y-%m-%d %H:%M:%S"):
-            try:
-                dt = datetime.strptime(raw, fmt)
-                return int(dt.replace(tzinfo=timezone.utc).timestamp())
-            except ValueError:
-                continue
+        parsed = _parse_timestamp(raw)
+        if parsed is not None:
+            return parsed
     return int(time.time())
 
 
-if __name__ == "__main__":
-    main()
-
-
-_NORMALIZED_CACHE_KEY = object()
+@lru_cache(maxsize=4096)
+def _parse_timestamp(raw: str) -> int | None:
+    # Slice the two known fixed-width layouts directly; strptime is an order of
+    # magnitude slower and only kept as the fallback for looser spellings.
+    digits = None
+    if len(raw) == 15 and raw[8] == "_":
+        digits = raw[:8] + raw[9:]
+    elif len(raw) == 19 and raw[4] == raw[7] == "-" and raw[10] == " " and raw[13] == raw[16] == ":":
+        digits = raw[0:4] + raw[5:7] + raw[8:10] + raw[11:13] + raw[14:16] + raw[17:19]
+    if digits is not None and digits.isascii() and digits.isdigit():
+        try:
+            dt = datetime(
+                int(digits[0:4]),
+                int(digits[4:6]),
+                int(digits[6:8]),
+                int(digits[8:10]),
+                int(digits[10:12]),
+                int(digits[12:14]),
+                tzinfo=timezone.utc,
+            )
+            return int(dt.timestamp())
+        except ValueError:
+            pass
+    for fmt in ("%Y%m%d_%H%M%S", "%Y-%m-%d %H:%M:%S"):
+        try:
+            dt = datetime.strptime(raw, fmt)
+            return int(dt.replace(tzinfo=timezone.utc).timestamp())
+        except ValueError:
+            continue
+    return None
 
 
 def _meta_lookup(
@@ -339,42 +530,69 @@ def _meta_lookup(
     alias_map: Dict[str, Sequence[str]] | None,
     *keys: str,
     default: str = "",
+    norm_metadata: Dict[str, str] | None = None,
+) -> str:
+    """Return the first value for ``keys``/aliases, preferring exact over normalised matches."""
+
+    # Fast path: canonical column names hit directly without touching aliases.
+    if keys and keys[0]:
+        value = metadata.get(keys[0])
+        if value is not None:
+            return value
+    return _meta_lookup_slow(metadata, alias_map or {}, keys, default, norm_metadata)
+
+
+def _meta_lookup_slow(
+    metadata: Dict[str, str],
+    alias_map: Dict[str, Sequence[str]],
+    keys: Sequence[str],
+    default: str,
+    norm_metadata: Dict[str, str] | None,
 ) -> str:
-    search_keys: List[str] = []
-    alias_map = alias_map or {}
     for key in keys:
         if not key:
             continue
-        search_keys.append(key)
-        normalized_key = _normalize_meta_key(key)
-        for alias in alias_map.get(normalized_key, ()):  # type: ignore[arg-type]
+        value = metadata.get(key)
+        if value is not None:
+            return value
+        for alias in alias_map.get(_normalize_meta_key(key), ()):
             if alias:
-                search_keys.append(alias)
-
-    for key in search_keys:
-        if key in metadata:
-            value = metadata[key]
-            if value is not None:
-                return value
-    normalized = metadata.get(_NORMALIZED_CACHE_KEY)
-    if normalized is None:
-        normalized = {
-            _normalize_meta_key(existing_key): existing_value
-            for existing_key, existing_value in metadata.items()
-            if isinstance(existing_key, str)
-        }
-        metadata[_NORMALIZED_CACHE_KEY] = normalized
-    for key in search_keys:
-        normalized_key = _normalize_meta_key(key)
-        if normalized_key in normalized:
-            value = normalized[normalized_key]
-            if value is not None:
-                return value
+                value = metadata.get(alias)
+                if value is not None:
+                    return value
+
+    if norm_metadata is None:
+        norm_metadata = _normalize_metadata(metadata)
+    for key in keys:
+        if not key:
+            continue
+        norm_key = _normalize_meta_key(key)
+        value = norm_metadata.get(norm_key)
+        if value is not None:
+            return value
+        for alias in alias_map.get(norm_key, ()):
+            if alias:
+                value = norm_metadata.get(_normalize_meta_key(alias))
+                if value is not None:
+                    return value
     return default
 
 
+def _normalize_metadata(metadata: Dict[str, str]) -> Dict[str, str]:
+    return {_normalize_meta_key(key): value for key, value in metadata.items()}
+
+
 def _normalize_meta_key(key: str) -> str:
-    return "".join(ch for ch in key.upper() if ch.isalnum())
+    normalized = _NORMALIZED_KEYS.get(key)
+    if normalized is None:
+        normalized = "".join(ch for ch in key.upper() if ch.isalnum())
+        _NORMALIZED_KEYS[key] = normalized
+    return normalized
+
+
+# Memo of raw key -> normalised key. Seeded at import with every canonical column
+# name and default alias; CSV headers and custom aliases are added on first use.
+_NORMALIZED_KEYS: Dict[str, str] = {}
 
 
 DEFAULT_COLUMN_ALIASES: Dict[str, Sequence[str]] = {
@@ -405,30 +623,52 @@ DEFAULT_COLUMN_ALIASES: Dict[str, Sequence[str]] = {
     "Test_CID": ("TEST_ID", "CID"),
 }
 
+for _canonical, _aliases in DEFAULT_COLUMN_ALIASES.items():
+    for _key in (_canonical, *_aliases):
+        _normalize_meta_key(_key)
+del _canonical, _aliases, _key
 
-def _build_column_aliases(custom_aliases: Dict[str, Sequence[str]]) -> Dict[str, Sequence[str]]:
-    combined: Dict[str, List[str]] = {}
-
-    def add_aliases(canonical: str, aliases: Sequence[str]) -> None:
-        norm_key = _normalize_meta_key(canonical)
-        bucket = combined.setdefault(norm_key, [])
-        for alias in aliases:
-            if not isinstance(alias, str):
-                alias = str(alias)
-            alias = alias.strip()
-            if not alias:
-                continue
-            if alias not in bucket:
-                bucket.append(alias)
 
-    for canonical, aliases in DEFAULT_COLUMN_ALIASES.items():
-        add_aliases(canonical, aliases)
+def _build_column_aliases(custom_aliases: Dict[str, Sequence[str]]) -> Dict[str, Sequence[str]]:
+    if not custom_aliases:
+        return _DEFAULT_ALIAS_MAP
 
+    combined: Dict[str, List[str]] = {key: list(values) for key, values in _DEFAULT_ALIAS_MAP.items()}
     for canonical, aliases in custom_aliases.items():
         if isinstance(aliases, str):
             normalised_aliases = [aliases]
         else:
             normalised_aliases = list(aliases)
-        add_aliases(canonical, normalised_aliases)
+        _add_aliases(combined, canonical, normalised_aliases)
 
     return {key: tuple(values) for key, values in combined.items()}
+
+
+def _add_aliases(combined: Dict[str, List[str]], canonical: str, aliases: Sequence[str]) -> None:
+    norm_key = _normalize_meta_key(canonical)
+    bucket = combined.setdefault(norm_key, [])
+    for alias in aliases:
+        if not isinstance(alias, str):
+            alias = str(alias)
+        alias = alias.strip()
+        if not alias:
+            continue
+        if alias not in bucket:
+            bucket.append(alias)
+
+
+def _build_default_aliases() -> Dict[str, Sequence[str]]:
+    combined: Dict[str, List[str]] = {}
+    for canonical, aliases in DEFAULT_COLUMN_ALIASES.items():
+        _add_aliases(combined, canonical, aliases)
+    return {key: tuple(values) for key, values in combined.items()}
+
+
+# Built once at import; shared by every config without custom aliases. It is not
+# wrapped in a MappingProxyType because MetaConfig must stay picklable for the
+# batch worker processes, so treat it as read-only.
+_DEFAULT_ALIAS_MAP: Dict[str, Sequence[str]] = _build_default_aliases()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,14 +4,31 @@
 """Simple Tkinter GUI for running CSV → STDF conversions with batch support."""
 from __future__ import annotations
 
+import os
 import queue
 import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
 from typing import List
 
-from csv_to_stdf import convert_csv_file, load_meta_config
+from csv_to_stdf import ConversionJob, MetaConfig, init_worker, load_meta_config, pool_size, run_job
+
+MAX_LOG_LINES = 1000
+
+
+@lru_cache(maxsize=8)
+def _cached_meta_config(meta_file: str | None, mtime_ns: int | None, head: int, site: int) -> MetaConfig:
+    return load_meta_config(meta_file, default_head=head, default_site=site)
+
+
+def _load_meta_config(meta_file: str | None, head: int, site: int) -> MetaConfig:
+    """Reuse the parsed metadata JSON across runs until the file is modified."""
+
+    mtime_ns = os.stat(meta_file).st_mtime_ns if meta_file else None
+    return _cached_meta_config(meta_file, mtime_ns, head, site)
 
 
 class ConverterGUI:
@@ -20,8 +37,16 @@ class ConverterGUI:
         self.root.title("CSV → STDF Converter")
         self.files: List[Path] = []
         self.log_queue: queue.Queue[str] = queue.Queue()
+        # Drains are scheduled on demand by _log rather than polled; the flag keeps
+        # a burst of messages from stacking up more than one pending drain.
+        self._drain_lock = threading.Lock()
+        self._drain_scheduled = False
+        # Pool of the batch in progress, kept so quitting can cancel queued files;
+        # otherwise the interpreter waits for the whole batch at exit.
+        self._executor: ProcessPoolExecutor | None = None
+        self._closing = False
         self._build_layout()
-        self.root.after(150, self._drain_log_queue)
+        self.root.protocol("WM_DELETE_WINDOW", self._quit)
 
     def _build_layout(self) -> None:
         main = ttk.Frame(self.root, padding=12)
@@ -74,7 +99,7 @@ class ConverterGUI:
         action_frame.grid(row=8, column=0, columnspan=4, sticky="ew", pady=(8, 8))
         self.run_button = ttk.Button(action_frame, text="Convert", command=self._start_conversion)
         self.run_button.grid(row=0, column=0, padx=(0, 8))
-        ttk.Button(action_frame, text="Quit", command=self.root.destroy).grid(row=0, column=1)
+        ttk.Button(action_frame, text="Quit", command=self._quit).grid(row=0, column=1)
 
         # Log output
         ttk.Label(main, text="Activity Log").grid(row=9, column=0, sticky="w")
@@ -90,11 +115,16 @@ class ConverterGUI:
             title="Select CSV files",
             filetypes=(("CSV Files", "*.csv"), ("All Files", "*.*")),
         )
+        known = set(self.files)
+        new_files: List[Path] = []
         for path in selections:
             candidate = Path(path)
-            if candidate not in self.files:
-                self.files.append(candidate)
-                self.file_listbox.insert(tk.END, str(candidate))
+            if candidate not in known:
+                known.add(candidate)
+                new_files.append(candidate)
+        if new_files:
+            self.files.extend(new_files)
+            self.file_listbox.insert(tk.END, *(str(candidate) for candidate in new_files))
 
     def _remove_selected(self) -> None:
         selected_indices = list(self.file_listbox.curselection())
@@ -155,43 +185,106 @@ class ConverterGUI:
         site: int,
     ) -> None:
         try:
-            meta_cfg = load_meta_config(meta_file, default_head=head, default_site=site)
+            meta_cfg = _load_meta_config(meta_file, head, site)
         except Exception as exc:  # noqa: BLE001
             self._log(f"Failed to load metadata: {exc}")
             self._notify_complete()
             return
 
+        jobs = [ConversionJob(csv_path, output_dir / f"{csv_path.stem}.stdf") for csv_path in files]
         failures = 0
-        for csv_path in files:
-            output_path = output_dir / f"{csv_path.stem}.stdf"
-            try:
-                convert_csv_file(csv_path, output_path, meta_cfg, source_label="GUI")
-                self._log(f"✔ Converted {csv_path} → {output_path}")
-            except Exception as exc:  # noqa: BLE001
-                failures += 1
-                self._log(f"✖ Failed {csv_path}: {exc}")
+        max_workers = pool_size(len(jobs))
+        if max_workers == 1:
+            # A single worker gains nothing from a process pool but its start-up cost.
+            for job in jobs:
+                if self._closing:
+                    return
+                try:
+                    output_path = run_job(job, meta_cfg, source_label="GUI")
+                    self._log(f"✔ Converted {job.input_path} → {output_path}")
+                except Exception as exc:  # noqa: BLE001
+                    failures += 1
+                    self._log(f"✖ Failed {job.input_path}: {exc}")
+        else:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                initializer=init_worker,
+                initargs=(meta_cfg, "GUI"),
+            ) as executor:
+                self._executor = executor
+                if self._closing:
+                    return
+                futures = {executor.submit(run_job, job): job for job in jobs}
+                for future in as_completed(futures):
+                    if self._closing:
+                        break
+                    job = futures[future]
+                    try:
+                        output_path = future.result()
+                        self._log(f"✔ Converted {job.input_path} → {output_path}")
+                    except Exception as exc:  # noqa: BLE001
+                        failures += 1
+                        self._log(f"✖ Failed {job.input_path}: {exc}")
+            self._executor = None
+        if self._closing:
+            return
 
         summary = "Conversion finished with no errors." if failures == 0 else f"Conversion finished with {failures} error(s)."
         self._log(summary)
         self._notify_complete()
 
+    def _quit(self) -> None:
+        self._closing = True
+        executor = self._executor
+        if executor is not None:
+            # Files already converting would still hold up interpreter exit, so the
+            # workers are stopped the way the daemon worker thread used to be cut off.
+            # shutdown() forgets the worker handles, so collect them first.
+            workers = list((executor._processes or {}).values())
+            executor.shutdown(wait=False, cancel_futures=True)
+            for process in workers:
+                process.terminate()
+        self.root.destroy()
+
     def _notify_complete(self) -> None:
-        self.root.after(0, lambda: self.run_button.config(state=tk.NORMAL))
+        try:
+            self.root.after(0, lambda: self.run_button.config(state=tk.NORMAL))
+        except (RuntimeError, tk.TclError):
+            pass
 
     def _log(self, message: str) -> None:
         self.log_queue.put(message)
+        with self._drain_lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        try:
+            self.root.after(0, self._drain_log_queue)
+        except (RuntimeError, tk.TclError):
+            # Tk is already gone (window closed mid-batch); the message is dropped
+            # rather than failing the conversion that logged it.
+            with self._drain_lock:
+                self._drain_scheduled = False
 
     def _drain_log_queue(self) -> None:
+        # Clear the flag before draining so a message queued mid-drain schedules the next one.
+        with self._drain_lock:
+            self._drain_scheduled = False
+        messages: List[str] = []
         while True:
             try:
-                message = self.log_queue.get_nowait()
+                messages.append(self.log_queue.get_nowait())
             except queue.Empty:
                 break
+        if messages:
             self.log_text.config(state=tk.NORMAL)
-            self.log_text.insert(tk.END, message + "\n")
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            # Keep a rolling window so long batches don't slow every insert down.
+            line_count = int(self.log_text.index("end-1c").split(".")[0])
+            if line_count - 1 > MAX_LOG_LINES:
+                self.log_text.delete("1.0", f"{line_count - MAX_LOG_LINES}.0")
             self.log_text.see(tk.END)
             self.log_text.config(state=tk.DISABLED)
-        self.root.after(150, self._drain_log_queue)
 
 
 def main() -> None:
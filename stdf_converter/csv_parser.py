@@ -4,9 +4,12 @@
 """Parses the Selene CSV layout into structured records."""
 from __future__ import annotations
 
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Sequence
+from itertools import chain, islice
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
 import csv
 
 
@@ -23,7 +26,13 @@ class TestDefinition:
 @dataclass
 class DeviceRecord:
     metadata: Dict[str, str]
-    measurements: Dict[int, str]
+    # Populated numeric results as parallel C arrays: the index into
+    # ``ParsedCsv.tests`` and the parsed value. Unparseable cells are omitted.
+    result_indices: array
+    result_values: array
+    # Converter-side cache filled once per device before records are written;
+    # kept out of repr/eq so it never reads as parsed CSV data.
+    norm_metadata: Dict[str, str] | None = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -37,55 +46,39 @@ class ParsedCsv:
 def parse_csv(input_path: str) -> ParsedCsv:
     """Return structured data extracted from the bespoke CSV format."""
 
-    rows: List[List[str]] = []
     with Path(input_path).open(newline="", encoding="utf-8-sig") as handle:
         reader = csv.reader(handle)
-        for row in reader:
-            rows.append([cell.strip() for cell in row])
-    if len(rows) < 6:
-        raise ValueError("CSV file does not contain enough rows for headers and data")
-
-    header = rows[0]
-    test_number_row = rows[1]
-    lower_limit_row = rows[2]
-    upper_limit_row = rows[3]
-    units_row = rows[4]
-    data_rows = rows[5:]
-
-    metadata_columns: List[int] = []
-    test_definitions: List[TestDefinition] = []
-
-    for idx, title in enumerate(header):
-        raw_test_number = _cell(test_number_row, idx)
-        test_number = _parse_int(raw_test_number)
-        if test_number is None:
-            metadata_columns.append(idx)
-            continue
-        test_definitions.append(
-            TestDefinition(
-                column_index=idx,
-                name=title or f"TEST_{test_number}",
-                test_number=test_number,
-                unit=_clean_string(_cell(units_row, idx)) or None,
-                lower_limit=_parse_float(_cell(lower_limit_row, idx)),
-                upper_limit=_parse_float(_cell(upper_limit_row, idx)),
+        header_rows = [[cell.strip() for cell in row] for row in islice(reader, 5)]
+        first_data_row = next(reader, None)
+        if first_data_row is None:
+            raise ValueError("CSV file does not contain enough rows for headers and data")
+
+        header, test_number_row, lower_limit_row, upper_limit_row, units_row = header_rows
+
+        metadata_columns: List[int] = []
+        test_definitions: List[TestDefinition] = []
+
+        for idx, title in enumerate(header):
+            raw_test_number = _cell(test_number_row, idx)
+            test_number = _parse_int(raw_test_number)
+            if test_number is None:
+                metadata_columns.append(idx)
+                continue
+            test_definitions.append(
+                TestDefinition(
+                    column_index=idx,
+                    name=title or f"TEST_{test_number}",
+                    test_number=test_number,
+                    unit=_clean_string(_cell(units_row, idx)) or None,
+                    lower_limit=_parse_float(_cell(lower_limit_row, idx)),
+                    upper_limit=_parse_float(_cell(upper_limit_row, idx)),
+                )
             )
-        )
 
-    devices: List[DeviceRecord] = []
-    for row in data_rows:
-        if not any(cell.strip() for cell in row):
-            continue
-        metadata = {
-            header[idx]: _cell(row, idx)
-            for idx in metadata_columns
-            if idx < len(header) and header[idx]
-        }
-        measurements = {
-            definition.test_number: _cell(row, definition.column_index)
-            for definition in test_definitions
-        }
-        devices.append(DeviceRecord(metadata=metadata, measurements=measurements))
+        # Data rows are turned into devices as they are read so the raw row lists
+        # never have to be held in memory alongside the parsed records.
+        data_rows = chain((first_data_row,), reader)
+        devices = list(iter_devices(data_rows, header, metadata_columns, test_definitions))
 
     return ParsedCsv(
         headers=header,
@@ -95,6 +88,65 @@ def parse_csv(input_path: str) -> ParsedCsv:
     )
 
 
+def iter_devices(
+    rows: Iterable[Sequence[str]],
+    header: Sequence[str],
+    metadata_columns: Sequence[int],
+    test_definitions: Sequence[TestDefinition],
+) -> Iterator[DeviceRecord]:
+    """Yield one ``DeviceRecord`` per non-blank data row."""
+
+    # Resolve the column layout once; per row the cells are then pulled out by
+    # C-level itemgetters instead of per-cell Python calls.
+    meta_indices = [idx for idx in metadata_columns if idx < len(header) and header[idx]]
+    meta_names = [header[idx] for idx in meta_indices]
+    # With duplicate test numbers the last column wins, so every definition of a
+    # number reads that column.
+    last_column = {definition.test_number: definition.column_index for definition in test_definitions}
+    test_columns = [last_column[definition.test_number] for definition in test_definitions]
+    get_meta = _columns_getter(meta_indices)
+    get_tests = _columns_getter(test_columns)
+    width = len(header)
+    padding = [""] * width
+    all_test_indices = array("I", range(len(test_columns)))
+
+    strip = str.strip
+    for raw_row in rows:
+        row = list(map(strip, raw_row))
+        if not any(row):
+            continue
+        if len(row) < width:
+            row.extend(padding[len(row):])
+        metadata = dict(zip(meta_names, get_meta(row)))
+        test_cells = get_tests(row)
+        try:
+            # Fast path: a fully populated numeric row converts in one C-level pass.
+            result_values = array("d", map(float, test_cells))
+            result_indices = all_test_indices[:]
+        except ValueError:
+            result_indices = array("I")
+            result_values = array("d")
+            for test_idx, cell in enumerate(test_cells):
+                value = _parse_result(cell)
+                if value is not None:
+                    result_indices.append(test_idx)
+                    result_values.append(value)
+        yield DeviceRecord(
+            metadata=metadata,
+            result_indices=result_indices,
+            result_values=result_values,
+        )
+
+
+def _columns_getter(indices: Sequence[int]) -> Callable[[Sequence[str]], Tuple[str, ...]]:
+    if not indices:
+        return lambda row: ()
+    if len(indices) == 1:
+        (only,) = indices
+        return lambda row: (row[only],)
+    return itemgetter(*indices)
+
+
 def _cell(row: Sequence[str], idx: int) -> str:
     if idx >= len(row):
         return ""
@@ -125,5 +177,14 @@ def _parse_float(value: str | None) -> float | None:
         return None
 
 
+def _parse_result(value: str) -> float | None:
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
 def _clean_string(value: str | None) -> str:
     return (value or "").strip()
@@ -4,8 +4,8 @@
 """Minimal STDF v4 binary writer used by the CSV converter."""
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, Sequence, Tuple, Union
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
 import struct
 
 
@@ -17,6 +17,15 @@ class RecordDef:
     typ: int
     sub: int
     field_map: Sequence[Tuple[str, str]]
+    segments: Tuple["_Segment", ...] = field(init=False, repr=False, compare=False)
+    fixed_size: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        segments = _compile_segments(self.field_map)
+        object.__setattr__(self, "segments", segments)
+        # Smallest payload: fixed-width fields plus one byte per C1/Cn/Bn field.
+        fixed_size = sum(packer.size if packer is not None else 1 for packer, _ in segments)
+        object.__setattr__(self, "fixed_size", fixed_size)
 
 
 _PACK_FORMATS: Dict[str, str] = {
@@ -30,9 +39,42 @@ _PACK_FORMATS: Dict[str, str] = {
     "B1": "<B",
 }
 
+_PACK_STRUCTS: Dict[str, struct.Struct] = {key: struct.Struct(fmt) for key, fmt in _PACK_FORMATS.items()}
+_HEADER = struct.Struct("<HBB")
+_U1 = _PACK_STRUCTS["U1"]
+_C1_DEFAULT = b" "
+
+# A run of consecutive fixed-width fields packed by one compound Struct, or a
+# single variable-width field (Struct is None) encoded on its own.
+_Segment = Tuple[Optional[struct.Struct], Tuple[Tuple[str, str], ...]]
+
+
+def _compile_segments(field_map: Sequence[Tuple[str, str]]) -> Tuple[_Segment, ...]:
+    segments = []
+    run = []
+
+    def close_run() -> None:
+        if run:
+            fmt = "<" + "".join(_PACK_FORMATS[field_type][1:] for _, field_type in run)
+            segments.append((struct.Struct(fmt), tuple(run)))
+            run.clear()
+
+    for field_name, field_type in field_map:
+        if field_type in _PACK_FORMATS:
+            run.append((field_name, field_type))
+            continue
+        close_run()
+        segments.append((None, ((field_name, field_type),)))
+    close_run()
+    return tuple(segments)
+
 
 class BinaryRecordWriter:
-    """Serialises STDF record payloads and writes them with the proper header."""
+    """Serialises STDF record payloads and writes them with the proper header.
+
+    The writer never calls ``flush()`` on the stream; flushing is left to whoever
+    owns the stream so upstream buffering can accumulate full chunks.
+    """
 
     def __init__(self, stream):
         self._stream = stream
@@ -40,23 +82,48 @@ class BinaryRecordWriter:
     def write(self, record: RecordDef, values: Dict[str, Union[str, int, float, bytes, bytearray, Iterable[int]]]):
         """Write a complete record, padding missing fields with sensible defaults."""
 
-        payload = bytearray()
-        for field_name, field_type in record.field_map:
-            payload.extend(self._encode_field(field_type, values.get(field_name)))
-        header = struct.pack("<HBB", len(payload), record.typ, record.sub)
-        self._stream.write(header)
-        self._stream.write(payload)
+        # Reserve the 4-byte header up front and fill it in once the payload length
+        # is known, so the record is built and written as a single buffer.
+        record_bytes = bytearray(_HEADER.size)
+        normalise = self._normalise_numeric
+        for packer, fields in record.segments:
+            if packer is None:
+                field_name, field_type = fields[0]
+                record_bytes += self._encode_field(field_type, values.get(field_name))
+            else:
+                record_bytes += packer.pack(
+                    *[normalise(field_type, values.get(field_name)) for field_name, field_type in fields]
+                )
+        _HEADER.pack_into(record_bytes, 0, len(record_bytes) - _HEADER.size, record.typ, record.sub)
+        self._emit(record_bytes)
 
-    def _encode_field(self, field_type: str, value):
-        if field_type in _PACK_FORMATS:
-            pack_fmt = _PACK_FORMATS[field_type]
-            return struct.pack(pack_fmt, self._normalise_numeric(field_type, value))
+    def write_template(self, template: "RecordTemplate", *values) -> None:
+        """Write a record from a prepared template, supplying only its variable fields."""
+
+        self._emit(template.encode(*values))
+
+    def write_block(self, block: "TemplateBlock", values: Sequence) -> None:
+        """Write every record of a prepared block, one slot value per record."""
+
+        self._emit(block.encode(values))
+
+    def flush_batch(self) -> None:
+        """Hand any batched records to the stream (no-op for the unbatched writer)."""
+
+    def _emit(self, data: bytes) -> None:
+        self._stream.write(data)
+
+    @classmethod
+    def _encode_field(cls, field_type: str, value):
+        packer = _PACK_STRUCTS.get(field_type)
+        if packer is not None:
+            return packer.pack(cls._normalise_numeric(field_type, value))
         if field_type == "C1":
-            return self._encode_c1(value)
+            return cls._encode_c1(value)
         if field_type == "Cn":
-            return self._encode_cn(value)
+            return cls._encode_cn(value)
         if field_type == "Bn":
-            return self._encode_bn(value)
+            return cls._encode_bn(value)
         raise ValueError(f"Unsupported STDF field type: {field_type}")
 
     @staticmethod
@@ -77,14 +144,12 @@ class BinaryRecordWriter:
 
     @staticmethod
     def _encode_c1(value) -> bytes:
-        char = (value or " ")
-        if isinstance(char, str):
-            if len(char) == 0:
-                char = " "
-            char = char[0]
-            data = char.encode("ascii", errors="ignore") or b" "
+        if not value:
+            return _C1_DEFAULT
+        if isinstance(value, str):
+            data = value[0].encode("ascii", errors="ignore") or _C1_DEFAULT
         else:
-            data = bytes([char])[:1]
+            data = bytes([value])[:1]
         return data
 
     @staticmethod
@@ -95,8 +160,12 @@ class BinaryRecordWriter:
             data = value[:255]
         else:
             text = str(value)
-            data = text.encode("ascii", errors="ignore")[:255]
-        return struct.pack("<B", len(data)) + data
+            # Pure-ASCII text (the usual case) takes CPython's straight-copy path.
+            if text.isascii():
+                data = text.encode("latin-1")[:255]
+            else:
+                data = text.encode("ascii", errors="ignore")[:255]
+        return _U1.pack(len(data)) + data
 
     @staticmethod
     def _encode_bn(value) -> bytes:
@@ -105,10 +174,141 @@ class BinaryRecordWriter:
         if isinstance(value, (bytes, bytearray)):
             data = bytes(value)
         else:
-            data = bytes(int(v) & 0xFF for v in value)
+            if not isinstance(value, (list, tuple)):
+                value = list(value)
+            try:
+                # In-range ints convert in C; anything else takes the masking path.
+                data = bytes(value)
+            except (TypeError, ValueError):
+                data = bytes(int(v) & 0xFF for v in value)
         if len(data) > 255:
             data = data[:255]
-        return struct.pack("<B", len(data)) + data
+        return _U1.pack(len(data)) + data
+
+
+class BatchRecordWriter(BinaryRecordWriter):
+    """Accumulates serialised records in memory until :meth:`flush_batch` is called."""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self._batch = bytearray()
+
+    def flush_batch(self) -> None:
+        if self._batch:
+            self._stream.write(self._batch)
+            self._batch.clear()
+
+    def _emit(self, data: bytes) -> None:
+        self._batch += data
+
+
+class RecordTemplate:
+    """Pre-encodes the constant fields of a record so only the varying ones are packed per write.
+
+    ``variable_fields`` names the fields supplied positionally to :meth:`encode`;
+    every other field is taken from ``constants`` and encoded once up front.
+    """
+
+    def __init__(
+        self,
+        record: RecordDef,
+        constants: Dict[str, Union[str, int, float, bytes, bytearray, Iterable[int]]],
+        variable_fields: Sequence[str],
+    ):
+        self.record = record
+        self._variable_types = tuple(dict(record.field_map)[field_name] for field_name in variable_fields)
+        self._parts: list = []
+        pending = bytearray()
+        for field_name, field_type in record.field_map:
+            if field_name not in variable_fields:
+                pending += BinaryRecordWriter._encode_field(field_type, constants.get(field_name))
+                continue
+            if pending:
+                self._parts.append((bytes(pending), None))
+                pending.clear()
+            self._parts.append((variable_fields.index(field_name), _field_encoder(field_type)))
+        if pending:
+            self._parts.append((bytes(pending), None))
+
+    def encode(self, *values) -> bytes:
+        """Return the complete record (header included) for the given variable values."""
+
+        payload = b"".join([part if encoder is None else encoder(values[part]) for part, encoder in self._parts])
+        return _HEADER.pack(len(payload), self.record.typ, self.record.sub) + payload
+
+    def split_slot(self, *fixed_values) -> Tuple[bytes, str, bytes]:
+        """Return the record bytes around its first variable field and that field's struct code.
+
+        The other variable fields are encoded from ``fixed_values``; the first one
+        must be a fixed-width numeric field so the record length is known up front.
+        """
+
+        slot_type = self._variable_types[0]
+        before = bytearray()
+        after = bytearray()
+        current = before
+        for part, encoder in self._parts:
+            if encoder is None:
+                current += part
+            elif part == 0:
+                current = after
+            else:
+                current += encoder(fixed_values[part - 1])
+        payload_size = len(before) + _PACK_STRUCTS[slot_type].size + len(after)
+        header = _HEADER.pack(payload_size, self.record.typ, self.record.sub)
+        return header + before, _PACK_FORMATS[slot_type][1:], bytes(after)
+
+
+class TemplateBlock:
+    """A run of templates written back to back, packed by one compound Struct.
+
+    The first variable field of every template is left as a slot filled from the
+    ``values`` passed to :meth:`encode`; the remaining variable fields are fixed to
+    ``fixed_values`` for the whole block. Slots must be fixed-width numeric fields.
+    """
+
+    def __init__(self, templates: Sequence[RecordTemplate], *fixed_values):
+        fmt = ["<"]
+        pieces: list = []
+        pending = bytearray()
+        for template in templates:
+            before, slot_code, after = template.split_slot(*fixed_values)
+            pending += before
+            fmt.append(f"{len(pending)}s{slot_code}")
+            pieces.append(bytes(pending))
+            pieces.append(None)
+            pending[:] = after
+        fmt.append(f"{len(pending)}s")
+        pieces.append(bytes(pending))
+        self._struct = struct.Struct("".join(fmt))
+        self._pieces = pieces
+
+    def encode(self, values: Sequence) -> bytes:
+        """Return all records of the block with ``values`` placed in their slots."""
+
+        args = self._pieces[:]
+        args[1::2] = values
+        return self._struct.pack(*args)
+
+
+class EncodedField(bytes):
+    """Field bytes already in STDF wire form; templates splice them in unchanged."""
+
+
+def preencode(field_type: str, value) -> EncodedField:
+    """Encode ``value`` once so it can be reused across many :meth:`RecordTemplate.encode` calls."""
+
+    return EncodedField(BinaryRecordWriter._encode_field(field_type, value))
+
+
+def _field_encoder(field_type: str):
+    packer = _PACK_STRUCTS.get(field_type)
+    if packer is None:
+        encode = BinaryRecordWriter._encode_field
+        return lambda value: value if value.__class__ is EncodedField else encode(field_type, value)
+    pack = packer.pack
+    normalise = BinaryRecordWriter._normalise_numeric
+    return lambda value: value if value.__class__ is EncodedField else pack(normalise(field_type, value))
 
 
 FAR = RecordDef(